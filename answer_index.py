@@ -0,0 +1,224 @@
+import json
+import os
+import re
+import threading
+import zlib
+
+import numpy as np
+
+# Mersenne prime used by the MinHash permutations; keeps a * x + b inside int64.
+MINHASH_PRIME = (1 << 31) - 1
+
+
+def normalize_text(text):
+    return re.findall(r"\w+", (text or "").lower())
+
+
+def shingle_hashes(text, shingle_size=3):
+    """
+    Hashes the word shingles of a text to stable 32-bit integers.
+
+    Args:
+        text (str): Text to shingle.
+        shingle_size (int): Number of words per shingle.
+
+    Returns:
+        np.ndarray: Unique shingle hashes (int64).
+    """
+    words = normalize_text(text)
+    if len(words) <= shingle_size:
+        shingles = [" ".join(words)]
+    else:
+        shingles = [" ".join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1)]
+    hashes = [zlib.crc32(s.encode("utf-8")) for s in shingles]
+    return np.unique(np.array(hashes, dtype=np.int64))
+
+
+class AnswerIndex:
+    """
+    MinHash index over past (question, answer, feedback, scores) records.
+
+    Answers are compared only against answers to the same question within
+    the same scope (e.g. the feedback prompt version and model that produced
+    the stored feedback). The similarity is the MinHash estimate of the
+    Jaccard similarity of the answers' word shingles, in [0, 1].
+    """
+
+    def __init__(self, threshold=0.85, num_perm=128, shingle_size=3, seed=1):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.seed = seed
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, MINHASH_PRIME, size=num_perm).astype(np.int64)
+        self._b = rng.randint(0, MINHASH_PRIME, size=num_perm).astype(np.int64)
+        self._signatures = np.empty((0, num_perm), dtype=np.int64)
+        self._question_ids = np.empty(0, dtype=np.int64)
+        self._questions = {}
+        self.records = []
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        # Bumped on every add; save() uses it to skip unchanged or stale snapshots
+        self._generation = 0
+        self._saved_generation = {}
+
+    def __len__(self):
+        return len(self.records)
+
+    def signature(self, answer):
+        hashes = shingle_hashes(answer, self.shingle_size)
+        permuted = (np.outer(hashes, self._a) + self._b) % MINHASH_PRIME
+        return permuted.min(axis=0)
+
+    def _question_id(self, question, scope="", create=False):
+        key = scope + "\n" + " ".join(normalize_text(question))
+        if key not in self._questions and create:
+            self._questions[key] = len(self._questions)
+        return self._questions.get(key, -1)
+
+    def add(self, question, answer, feedback, scores=None, scope=""):
+        """
+        Stores a graded answer so later near-duplicates can reuse it.
+
+        Returns:
+            int: Position of the new record.
+        """
+        signature = self.signature(answer)
+        with self._lock:
+            return self._append(question, answer, feedback, scores, scope, signature)
+
+    def _append(self, question, answer, feedback, scores, scope, signature):
+        n = len(self.records)
+        if n == self._signatures.shape[0]:
+            capacity = max(16, 2 * n)
+            signatures = np.empty((capacity, self.num_perm), dtype=np.int64)
+            signatures[:n] = self._signatures[:n]
+            question_ids = np.empty(capacity, dtype=np.int64)
+            question_ids[:n] = self._question_ids[:n]
+            self._signatures, self._question_ids = signatures, question_ids
+        self._signatures[n] = signature
+        self._question_ids[n] = self._question_id(question, scope, create=True)
+        self.records.append({
+            "question": question,
+            "answer": answer,
+            "feedback": feedback,
+            "scores": scores,
+        })
+        self._generation += 1
+        return n
+
+    def query_batch(self, pairs, k=1, min_similarity=0.0, scope=""):
+        """
+        Finds the nearest stored answers for many (question, answer) pairs at once.
+
+        Args:
+            pairs (list): (question, answer) tuples.
+            k (int): Maximum number of neighbours per pair.
+            min_similarity (float): Neighbours below this similarity are dropped.
+            scope (str): Only records added with the same scope are considered.
+
+        Returns:
+            list: For each pair, a list of (similarity, record) tuples, most similar first.
+        """
+        with self._lock:
+            n = len(self.records)
+            signatures = self._signatures[:n]
+            question_ids = self._question_ids[:n]
+            records = self.records[:n]
+        results = []
+        for question, answer in pairs:
+            qid = self._question_id(question, scope)
+            candidates = np.flatnonzero(question_ids == qid) if qid >= 0 else np.empty(0, dtype=np.int64)
+            if candidates.size == 0:
+                results.append([])
+                continue
+            sims = (signatures[candidates] == self.signature(answer)).mean(axis=1)
+            top = np.argsort(-sims, kind="stable")[:k]
+            results.append([
+                (float(sims[i]), records[candidates[i]])
+                for i in top if sims[i] >= min_similarity
+            ])
+        return results
+
+    def query(self, question, answer, k=1, min_similarity=0.0, scope=""):
+        return self.query_batch([(question, answer)], k=k, min_similarity=min_similarity, scope=scope)[0]
+
+    def lookup(self, question, answer, scope=""):
+        """
+        Returns the stored record for a near-duplicate answer, or None if no
+        stored answer reaches the index threshold.
+        """
+        matches = self.query(question, answer, k=1, min_similarity=self.threshold, scope=scope)
+        return matches[0][1] if matches else None
+
+    def save(self, path):
+        """
+        Writes the index to <path>.npz (signatures) and <path>.json (records).
+
+        Safe to call while other threads add records. Nothing is written if
+        the index has not changed since the last save to `path`, or if a
+        newer snapshot was already saved there. Each file is replaced
+        atomically, and the signatures are written first so a crash between
+        the two leaves extra rows that load() ignores.
+
+        Returns:
+            bool: Whether the files were written.
+        """
+        with self._lock:
+            generation = self._generation
+            if self._saved_generation.get(path, -1) >= generation:
+                return False
+            n = len(self.records)
+            signatures = self._signatures[:n].copy()
+            question_ids = self._question_ids[:n].copy()
+            meta = {
+                "threshold": self.threshold,
+                "num_perm": self.num_perm,
+                "shingle_size": self.shingle_size,
+                "seed": self.seed,
+                "questions": dict(self._questions),
+                "records": self.records[:n],
+            }
+        with self._save_lock:
+            if self._saved_generation.get(path, -1) >= generation:
+                return False
+            with open(path + ".npz.tmp", "wb") as f:
+                np.savez(f, signatures=signatures, question_ids=question_ids)
+            os.replace(path + ".npz.tmp", path + ".npz")
+            with open(path + ".json.tmp", "w", encoding="utf-8") as f:
+                json.dump(meta, f, ensure_ascii=False)
+            os.replace(path + ".json.tmp", path + ".json")
+            self._saved_generation[path] = generation
+        return True
+
+    @classmethod
+    def load(cls, path):
+        with open(path + ".json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        index = cls(
+            threshold=meta["threshold"],
+            num_perm=meta["num_perm"],
+            shingle_size=meta["shingle_size"],
+            seed=meta["seed"],
+        )
+        n = len(meta["records"])
+        with np.load(path + ".npz") as arrays:
+            index._signatures = arrays["signatures"][:n]
+            index._question_ids = arrays["question_ids"][:n]
+        index._questions = meta["questions"]
+        index.records = meta["records"]
+        index._saved_generation[path] = index._generation
+        return index
+
+
+# Example usage
+if __name__ == "__main__":
+    index = AnswerIndex(threshold=0.6)
+    question = "Explain OOP principles."
+    index.add(
+        question,
+        "OOP is built on encapsulation, inheritance, polymorphism and abstraction.",
+        {"content_depth": "Good coverage of the four pillars.", "clarity": "Clear.", "relevance": "Relevant.", "confidence": "Confident."},
+    )
+    print(index.query(question, "OOP is built on encapsulation, inheritance, polymorphism, and abstraction!"))
+    print(index.lookup(question, "I like functional programming more."))
@@ -1,35 +1,101 @@
-from flask import Flask, request, jsonify
-import requests
+from flask import Flask, Response, request, jsonify
+import atexit
 import json
+import os
+import threading
+import time
+from concurrent.futures import CancelledError
+
+from answer_index import AnswerIndex
+from llm_scheduler import INTERACTIVE, PRIORITY_NAMES, DeadlineExceeded, QueueFullError, get_scheduler, ollama_generate
+from prompt_registry import registry, render_prompt
+from score_analytics import DIMENSIONS, ROLLUP_DIMENSIONS, ScoreStore
+from scoring_function import score_feedback
+from session_exporter import EXPORT_FORMATS, EXPORT_MIMETYPES, stream_session, validate_session
+from transcription_pool import PoolBusyError, TranscriptionPool
 
 # Ollama API config
 OLLAMA_API_URL = "http://localhost:11434/api/generate"
 OLLAMA_MODEL = "gemma3:1b"  # ✅ Use the model you have downloaded
 
+# Per-answer scores are appended here for cohort analytics
+ANALYTICS_DIR = os.environ.get("ANALYTICS_DIR", "analytics_data")
+
+# Near-duplicate answers to the same question reuse stored feedback; the
+# index is saved to <ANSWER_INDEX_PATH>.npz/.json in the background every
+# ANSWER_INDEX_SAVE_INTERVAL seconds (if it changed) and on exit
+FEEDBACK_REUSE_THRESHOLD = float(os.environ.get("FEEDBACK_REUSE_THRESHOLD", "0.85"))
+ANSWER_INDEX_PATH = os.environ.get("ANSWER_INDEX_PATH", os.path.join(ANALYTICS_DIR, "answer_index"))
+ANSWER_INDEX_SAVE_INTERVAL = float(os.environ.get("ANSWER_INDEX_SAVE_INTERVAL", "30"))
+
+def load_answer_index(path):
+    if not os.path.exists(path + ".json"):
+        return AnswerIndex(threshold=FEEDBACK_REUSE_THRESHOLD)
+    index = AnswerIndex.load(path)
+    index.threshold = FEEDBACK_REUSE_THRESHOLD
+    return index
+
+def save_answer_index():
+    # A failed save only loses reuse across restarts, so it must not fail the request
+    try:
+        directory = os.path.dirname(ANSWER_INDEX_PATH)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        get_answer_index().save(ANSWER_INDEX_PATH)
+    except Exception as e:
+        print("Could not save answer index:", e)
+
+def autosave_answer_index():
+    while True:
+        time.sleep(ANSWER_INDEX_SAVE_INTERVAL)
+        save_answer_index()
+
+# Uploaded audio answers are transcribed by resident Whisper worker processes
+WHISPER_MODEL = os.environ.get("WHISPER_MODEL", "base")
+WHISPER_WORKERS = int(os.environ.get("WHISPER_WORKERS", "0")) or None  # 0: one per CPU core
+AUDIO_EXTENSIONS = {".wav", ".mp3", ".m4a", ".ogg", ".webm", ".flac"}
+
+# Shared state is created on first use: spawned Whisper workers (and the
+# debug reloader) re-import this module, and must not load the stores too
+_score_store = None
+_answer_index = None
+_transcription_pool = None
+_state_lock = threading.Lock()
+
+def get_score_store():
+    global _score_store
+    with _state_lock:
+        if _score_store is None:
+            _score_store = ScoreStore(ANALYTICS_DIR)
+        return _score_store
+
+def get_answer_index():
+    global _answer_index
+    with _state_lock:
+        if _answer_index is None:
+            _answer_index = load_answer_index(ANSWER_INDEX_PATH)
+            threading.Thread(target=autosave_answer_index, daemon=True).start()
+            atexit.register(save_answer_index)
+        return _answer_index
+
+def get_transcription_pool():
+    global _transcription_pool
+    with _state_lock:
+        if _transcription_pool is None:
+            _transcription_pool = TranscriptionPool(
+                model_size=WHISPER_MODEL,
+                workers=WHISPER_WORKERS,
+                on_transcript=evaluate_transcript
+            )
+        return _transcription_pool
+
 app = Flask(__name__)
+app.config["MAX_CONTENT_LENGTH"] = 25 * 1024 * 1024
 
 # Function to generate a question from resume and role
-def generate_question(resume_text, role):
-    prompt = f"""
-You are an AI interview coach. Given the following resume, generate one thoughtful interview question for a {role} candidate, directly related to their experience or skills. 
-Provide a follow-up prompt structure to probe deeper if needed.
-
-Resume:
-\"\"\"
-{resume_text}
-\"\"\"
-
-Respond in JSON format:
-{{
-  "question": "...",
-  "follow_up_prompt": "..."
-}}
-"""
-    response = requests.post(
-        OLLAMA_API_URL,
-        json={"model": OLLAMA_MODEL, "prompt": prompt, "stream": False}
-    )
-    data = response.json()
+def generate_question(resume_text, role, user=None, priority=INTERACTIVE, round_type=None):
+    prompt, _ = render_prompt("question", role=role, round=round_type, model=OLLAMA_MODEL, resume_text=resume_text)
+    data = ollama_generate(prompt, OLLAMA_MODEL, priority=priority, user=user, api_url=OLLAMA_API_URL)
     print("OLLAMA generate_question RESPONSE:", data)
 
     if "response" not in data:
@@ -37,34 +103,74 @@ Respond in JSON format:
     return data["response"]
 
 # Function to generate feedback on the candidate's answer
-def generate_feedback(candidate_answer):
-    prompt = f"""
-You are an AI interview coach. Given the following candidate's answer to an interview question, provide detailed feedback in the following four aspects: content depth, clarity, relevance, and confidence. For each aspect, write 1-2 sentences.
-
-Candidate's answer:
-\"\"\"
-{candidate_answer}
-\"\"\"
-
-Respond in JSON format:
-{{
-  "content_depth": "...",
-  "clarity": "...",
-  "relevance": "...",
-  "confidence": "..."
-}}
-"""
-    response = requests.post(
-        OLLAMA_API_URL,
-        json={"model": OLLAMA_MODEL, "prompt": prompt, "stream": False}
-    )
-    data = response.json()
+def generate_feedback(candidate_answer, user=None, priority=INTERACTIVE, role=None, round_type=None):
+    prompt, _ = render_prompt("feedback", role=role, round=round_type, model=OLLAMA_MODEL, candidate_answer=candidate_answer)
+    data = ollama_generate(prompt, OLLAMA_MODEL, priority=priority, user=user, api_url=OLLAMA_API_URL)
     print("OLLAMA generate_feedback RESPONSE:", data)
 
     if "response" not in data:
         return f"Ollama error or malformed response: {data}"
     return data["response"]
 
+# Feedback, scoring and analytics for one answer, shared by the text and audio paths
+def evaluate_answer(candidate_answer, asked_question='', role='', round_type='', candidate_id='', priority=INTERACTIVE):
+    # Stored feedback is only reused if it came from the same feedback prompt and model
+    prompt_key = registry.get("feedback", role=role, round=round_type, model=OLLAMA_MODEL).key
+    scope = f"{prompt_key}|{OLLAMA_MODEL}"
+    answer_index = get_answer_index()
+    cached = answer_index.lookup(asked_question, candidate_answer, scope=scope)
+    if cached:
+        feedback = cached["feedback"]
+        scores = cached["scores"] or score_feedback(feedback)
+    else:
+        feedback_json = generate_feedback(candidate_answer, user=candidate_id, priority=priority, role=role, round_type=round_type)
+        try:
+            feedback = json.loads(feedback_json)
+            scores = score_feedback(feedback)
+            answer_index.add(asked_question, candidate_answer, feedback, scores, scope=scope)
+        except Exception:
+            feedback = {
+                "content_depth": feedback_json,
+                "clarity": "",
+                "relevance": "",
+                "confidence": ""
+            }
+            scores = score_feedback(feedback)
+
+    get_score_store().add(
+        scores,
+        role=role,
+        round=round_type,
+        model=OLLAMA_MODEL,
+        candidate=candidate_id
+    )
+
+    return feedback, scores
+
+# The LLM scheduler refuses work when a priority class is at its admission limit
+@app.errorhandler(QueueFullError)
+def queue_full(e):
+    return jsonify({"error": str(e)}), 503
+
+# Queued LLM requests are dropped once their deadline passes...
+@app.errorhandler(DeadlineExceeded)
+def deadline_exceeded(e):
+    return jsonify({"error": str(e)}), 504
+
+# ...and cancelled when the candidate's session ends
+@app.errorhandler(CancelledError)
+def request_cancelled(e):
+    return jsonify({"error": "Request was cancelled because the session ended"}), 409
+
+# Drops the candidate's queued LLM requests, e.g. pre-generations nobody will collect
+@app.route('/session/end', methods=['POST'])
+def end_session():
+    data = request.get_json()
+    candidate_id = data.get('candidate_id')
+    if not candidate_id:
+        return jsonify({"error": "Missing required fields"}), 400
+    return jsonify({"cancelled": get_scheduler().cancel_user(candidate_id)})
+
 # Main endpoint
 @app.route('/interview', methods=['POST'])
 def interview():
@@ -72,32 +178,155 @@ def interview():
     resume_text = data.get('resume_text')
     role = data.get('role')
     candidate_answer = data.get('candidate_answer')
+    asked_question = data.get('question', '')
+    candidate_id = data.get('candidate_id', '')
+    priority_name = data.get('priority', 'interactive')
 
     if not resume_text or not role or not candidate_answer:
         return jsonify({"error": "Missing required fields"}), 400
+    if priority_name not in PRIORITY_NAMES:
+        return jsonify({"error": f"Unknown priority: {priority_name}"}), 400
+    priority = PRIORITY_NAMES.index(priority_name)
 
-    question_json = generate_question(resume_text, role)
-    feedback_json = generate_feedback(candidate_answer)
+    question_json = generate_question(resume_text, role, user=candidate_id, priority=priority, round_type=data.get('round_type'))
 
     try:
         question = json.loads(question_json)
     except Exception:
         question = {"question": question_json, "follow_up_prompt": ""}
 
-    try:
-        feedback = json.loads(feedback_json)
-    except Exception:
-        feedback = {
-            "content_depth": feedback_json,
-            "clarity": "",
-            "relevance": "",
-            "confidence": ""
-        }
+    feedback, scores = evaluate_answer(
+        candidate_answer,
+        asked_question=asked_question,
+        role=role,
+        round_type=data.get('round_type', ''),
+        candidate_id=candidate_id,
+        priority=priority
+    )
 
     return jsonify({
         "question": question,
-        "feedback": feedback
+        "feedback": feedback,
+        "scores": scores
     })
 
+# Session export endpoint: streams the transcript instead of building it in memory
+@app.route('/export', methods=['POST'])
+def export():
+    data = request.get_json()
+    messages = data.get('messages')
+    fmt = data.get('format', 'txt')
+
+    if not isinstance(messages, list):
+        return jsonify({"error": "Missing required fields"}), 400
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"error": f"Unsupported format: {fmt}"}), 400
+    try:
+        validate_session(messages)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # Produce the first chunk before sending headers so render errors become a 500, not a truncated body
+    chunks = stream_session(messages, fmt=fmt)
+    try:
+        first = next(chunks, b"")
+    except Exception as e:
+        return jsonify({"error": f"Export failed: {e}"}), 500
+
+    def body():
+        yield first
+        yield from chunks
+
+    return Response(
+        body(),
+        mimetype=EXPORT_MIMETYPES[fmt],
+        headers={"Content-Disposition": f"attachment; filename=interview_session.{fmt}"}
+    )
+
+# Cohort analytics over stored scores
+@app.route('/analytics', methods=['GET'])
+def analytics():
+    view = request.args.get('view', 'rollup')
+    by = tuple(d for d in request.args.get('by', 'role').split(',') if d)
+    start = request.args.get('start', type=float)
+    end = request.args.get('end', type=float)
+    filters = {d: request.args.get(d) for d in DIMENSIONS if request.args.get(d)}
+    score_store = get_score_store()
+
+    if view == 'rollup':
+        if any(d not in ROLLUP_DIMENSIONS + ("day",) for d in by) or filters:
+            return jsonify({"error": f"Rollups group by {', '.join(ROLLUP_DIMENSIONS)} or day only"}), 400
+        start_day = int(start // 86400) if start is not None else None
+        end_day = int(end // 86400) if end is not None else None
+        result = score_store.rollup(by=by, start_day=start_day, end_day=end_day)
+    elif view == 'aggregate':
+        if any(d not in DIMENSIONS for d in by):
+            return jsonify({"error": f"Unknown dimension in: {', '.join(by)}"}), 400
+        result = score_store.aggregate(by=by, start=start, end=end, **filters)
+    elif view == 'trend':
+        bucket = request.args.get('bucket', 86400, type=float)
+        if bucket <= 0:
+            return jsonify({"error": "bucket must be a positive number of seconds"}), 400
+        result = score_store.trend(bucket_seconds=bucket, start=start, end=end, **filters)
+    elif view == 'weakest':
+        result = score_store.weakest_aspects(start=start, end=end, **filters)
+    else:
+        return jsonify({"error": f"Unknown view: {view}"}), 400
+
+    return jsonify({"view": view, "rows": len(score_store), "result": result})
+
+def evaluate_transcript(transcript, asked_question='', role='', round_type='', candidate_id=''):
+    feedback, scores = evaluate_answer(
+        transcript,
+        asked_question=asked_question,
+        role=role,
+        round_type=round_type,
+        candidate_id=candidate_id
+    )
+    return {"feedback": feedback, "scores": scores}
+
+@app.errorhandler(PoolBusyError)
+def pool_busy(e):
+    return jsonify({"error": str(e)}), 503
+
+# Audio answers: upload, then poll or stream the job until feedback is ready
+@app.route('/answer/audio', methods=['POST'])
+def answer_audio():
+    audio = request.files.get('audio')
+    if audio is None or not audio.filename:
+        return jsonify({"error": "Missing required fields"}), 400
+    suffix = os.path.splitext(audio.filename)[1].lower()
+    if suffix not in AUDIO_EXTENSIONS:
+        return jsonify({"error": f"Unsupported audio type: {suffix or audio.filename}"}), 400
+
+    job_id = get_transcription_pool().submit(
+        audio.read(),
+        suffix=suffix,
+        asked_question=request.form.get('question', ''),
+        role=request.form.get('role', ''),
+        round_type=request.form.get('round_type', ''),
+        candidate_id=request.form.get('candidate_id', '')
+    )
+    return jsonify({"job_id": job_id, "status": "queued"}), 202
+
+@app.route('/answer/audio/<job_id>', methods=['GET'])
+def answer_audio_status(job_id):
+    job = get_transcription_pool().status(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    return jsonify(job)
+
+@app.route('/answer/audio/<job_id>/events', methods=['GET'])
+def answer_audio_events(job_id):
+    transcription_pool = get_transcription_pool()
+    if transcription_pool.status(job_id) is None:
+        return jsonify({"error": "Unknown job"}), 404
+
+    def stream():
+        for job in transcription_pool.events(job_id):
+            yield f"data: {json.dumps(job)}\n\n"
+
+    return Response(stream(), mimetype="text/event-stream", headers={"Cache-Control": "no-cache"})
+
 if __name__ == '__main__':
     app.run(debug=True)
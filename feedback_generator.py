@@ -1,22 +1,9 @@
 import requests
 
-def get_answer_feedback(candidate_answer, model="gemma3:1b"):
-    prompt = f"""
-You are an AI interview coach. Given the following candidate's answer to an interview question, provide detailed feedback in the following four aspects: content depth, clarity, relevance, and confidence. For each aspect, write 1-2 sentences.
+from prompt_registry import render_prompt
 
-Candidate's answer:
-\"\"\"
-{candidate_answer}
-\"\"\"
-
-Respond in JSON format:
-{{
-  "content_depth": "...",
-  "clarity": "...",
-  "relevance": "...",
-  "confidence": "..."
-}}
-"""
+def get_answer_feedback(candidate_answer, model="gemma3:1b", role=None, round_type=None):
+    prompt, _ = render_prompt("feedback", role=role, round=round_type, model=model, candidate_answer=candidate_answer)
     try:
         response = requests.post(
             "http://localhost:11434/api/generate",
@@ -1,8 +1,18 @@
 import streamlit as st
-import requests
 import PyPDF2
 import io
 import json
+import os
+import uuid
+from concurrent.futures import CancelledError
+
+from answer_index import AnswerIndex
+from llm_scheduler import INTERACTIVE, PREGENERATION, DeadlineExceeded, QueueFullError, get_scheduler, submit_generate
+from prompt_registry import registry, render_prompt
+from score_analytics import ScoreStore
+from scoring_function import score_feedback
+from session_exporter import iter_session_text, stream_session
+from speculation import SPECULATION_TIMEOUT, promote
 
 OLLAMA_API_URL = "http://localhost:11434/api/generate"
 
@@ -21,78 +31,75 @@ def extract_text_from_pdf(pdf_file):
             text += page_text + '\n'
     return text
 
-def generate_interview_question(resume_text, role, model):
-    prompt = f"""
-You are an AI interview coach. Given the following resume, generate one thoughtful interview question for a {role} candidate, directly related to their experience or skills.
-Provide a follow-up prompt structure to probe deeper if needed.
-
-Resume:
-\"\"\"{resume_text}\"\"\"
-
-Respond in JSON format:
-{{
-  "question": "...",
-  "follow_up_prompt": "..."
-}}
-"""
-    response = requests.post(
-        OLLAMA_API_URL,
-        json={"model": model, "prompt": prompt, "stream": False}
-    )
-    return response.json()["response"]
-
-def generate_feedback(candidate_answer, model):
-    prompt = f"""
-You are an AI interview coach. Given the following candidate's answer to an interview question, provide detailed feedback in the following four aspects: content depth, clarity, relevance, and confidence. For each aspect, write 1-2 sentences.
-
-Candidate's answer:
-\"\"\"{candidate_answer}\"\"\"
-
-Respond in JSON format:
-{{
-  "content_depth": "...",
-  "clarity": "...",
-  "relevance": "...",
-  "confidence": "..."
-}}
-"""
-    response = requests.post(
-        OLLAMA_API_URL,
-        json={"model": model, "prompt": prompt, "stream": False}
-    )
-    return response.json()["response"]
+def submit_interview_question(resume_text, role, model, user=None, priority=INTERACTIVE, timeout=None, round_type=None):
+    prompt, _ = render_prompt("question", role=role, round=round_type, model=model, resume_text=resume_text)
+    return submit_generate(prompt, model, priority=priority, user=user, timeout=timeout, api_url=OLLAMA_API_URL)
+
+def submit_feedback(candidate_answer, model, user=None, priority=INTERACTIVE, timeout=None, role=None, round_type=None):
+    prompt, _ = render_prompt("feedback", role=role, round=round_type, model=model, candidate_answer=candidate_answer)
+    return submit_generate(prompt, model, priority=priority, user=user, timeout=timeout, api_url=OLLAMA_API_URL)
+
+def wait_for_response(future):
+    # Queued requests are cancelled when the session is reset and dropped once their deadline passes
+    try:
+        return future.result()["response"]
+    except CancelledError:
+        st.warning("The request was cancelled because the session was reset.")
+        st.stop()
+    except DeadlineExceeded as e:
+        st.error(f"The model did not respond in time: {e}")
+        st.stop()
+
+def generate_interview_question(resume_text, role, model, user=None, round_type=None):
+    return wait_for_response(submit_interview_question(resume_text, role, model, user=user, round_type=round_type))
+
+def generate_feedback(candidate_answer, model, user=None, role=None, round_type=None):
+    return wait_for_response(submit_feedback(candidate_answer, model, user=user, role=role, round_type=round_type))
+
+def parse_question(question_json):
+    try:
+        question_data = json.loads(question_json)
+        return question_data.get("question", ""), question_data.get("follow_up_prompt", "")
+    except Exception:
+        return question_json, ""
+
+def pregenerate_next_question():
+    # The question prompt does not depend on the answer, so the next one can
+    # be generated in the background while the candidate is still typing
+    try:
+        st.session_state.next_question = submit_interview_question(
+            st.session_state.resume_text, st.session_state.role, question_model,
+            user=st.session_state.user_id, priority=PREGENERATION, timeout=SPECULATION_TIMEOUT,
+            round_type=st.session_state.round_type
+        )
+    except QueueFullError:
+        # Optional work: promote() submits the question normally on the next answer
+        st.session_state.next_question = None
+
+def start_new_session():
+    # Streamlit has no session teardown hook, so this reset is where the old
+    # session's queued pre-generations are dropped from the shared scheduler
+    get_scheduler().cancel_user(st.session_state.user_id)
+    for key in ("messages", "resume_text", "role", "round_type", "next_question", "user_input"):
+        st.session_state.pop(key, None)
+    st.session_state.messages = []
+    st.session_state.user_id = uuid.uuid4().hex
+
+@st.cache_resource
+def get_answer_index():
+    # Shared across sessions so near-duplicate answers reuse earlier feedback
+    return AnswerIndex(threshold=float(os.environ.get("FEEDBACK_REUSE_THRESHOLD", "0.85")))
+
+@st.cache_resource
+def get_score_store():
+    # Same directory as the Flask app, so cohort analytics cover both front ends
+    return ScoreStore(os.environ.get("ANALYTICS_DIR", "analytics_data"))
 
 def build_session_history_text(messages):
-    lines = []
-    for msg in messages:
-        if msg["role"] == "ai":
-            lines.append(f"AI Interviewer: {msg['content']}")
-        else:
-            lines.append(f"You: {msg['content']}")
-            if "feedback" in msg and msg["feedback"]:
-                lines.append(f"Feedback:\n{msg['feedback']}")
-        lines.append("")
-    return "\n".join(lines)
+    return "".join(iter_session_text(messages))
 
 def build_session_history_pdf(messages):
-    from fpdf import FPDF
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_auto_page_break(auto=True, margin=15)
-    pdf.set_font("Arial", size=12)
-
-    for msg in messages:
-        if msg["role"] == "ai":
-            pdf.set_text_color(0, 0, 180)
-            pdf.multi_cell(0, 10, f"AI Interviewer: {msg['content']}")
-        else:
-            pdf.set_text_color(0, 0, 0)
-            pdf.multi_cell(0, 10, f"You: {msg['content']}")
-            if "feedback" in msg and msg["feedback"]:
-                pdf.set_text_color(128, 0, 0)
-                pdf.multi_cell(0, 10, f"Feedback:\n{msg['feedback']}")
-        pdf.ln(3)
-    return pdf.output(dest='S').encode('latin-1')
+    return b"".join(stream_session(messages, fmt="pdf"))
 
 # App main UI
 st.title("🤖 AI Interview Coach")
@@ -100,9 +107,13 @@ st.write("Upload your resume, select a job role, and chat with your AI interview
 
 if "messages" not in st.session_state:
     st.session_state.messages = []
+if "user_id" not in st.session_state:
+    st.session_state.user_id = uuid.uuid4().hex
+st.sidebar.button("Start new session", on_click=start_new_session)
 
 resume_file = st.file_uploader("Upload your PDF Resume", type=["pdf"])
 role = st.selectbox("Select the job role:", ["Software Engineer", "Data Scientist", "Product Manager", "Designer", "Other"])
+round_type = st.selectbox("Select the interview round:", ["Technical", "HR", "System Design"])
 
 if resume_file and role:
     resume_text = extract_text_from_pdf(resume_file)
@@ -111,17 +122,15 @@ if resume_file and role:
         st.session_state.resume_text = resume_text
     if not st.session_state.get("role"):
         st.session_state.role = role
+    if not st.session_state.get("round_type"):
+        st.session_state.round_type = round_type
 
     if len(st.session_state.messages) == 0:
-        question_json = generate_interview_question(st.session_state.resume_text, st.session_state.role, question_model)
-        try:
-            question_data = json.loads(question_json)
-            question = question_data.get("question", "")
-            follow_up = question_data.get("follow_up_prompt", "")
-        except Exception:
-            question = question_json
-            follow_up = ""
+        question_json = generate_interview_question(st.session_state.resume_text, st.session_state.role, question_model, user=st.session_state.user_id, round_type=st.session_state.round_type)
+        question, follow_up = parse_question(question_json)
         st.session_state.messages.append({"role": "ai", "content": question, "follow_up": follow_up})
+    if "next_question" not in st.session_state:
+        pregenerate_next_question()
 
     # Chat interface
     for msg in st.session_state.messages:
@@ -134,37 +143,61 @@ if resume_file and role:
     with st.form(key="user_input_form", clear_on_submit=True):
         user_input = st.text_area("Your answer:", key="user_input")
         submitted = st.form_submit_button("Submit")
-        if submitted and user_input.strip():
-            st.session_state.messages.append({"role": "user", "content": user_input})
-
-            feedback_json = generate_feedback(user_input, feedback_model)
+    if submitted and user_input.strip():
+        asked = st.session_state.messages[-1]["content"]
+
+        # Start (or reuse) the next question so it runs alongside the feedback
+        user_id = st.session_state.user_id
+        question_future = promote(
+            st.session_state.pop("next_question", None),
+            lambda: submit_interview_question(st.session_state.resume_text, st.session_state.role, question_model, user=user_id, round_type=st.session_state.round_type)
+        )
+
+        answer_index = get_answer_index()
+        # Stored feedback is only reused if it came from the same feedback prompt and model
+        prompt_key = registry.get("feedback", role=st.session_state.role, round=st.session_state.round_type, model=feedback_model).key
+        scope = f"{prompt_key}|{feedback_model}"
+        cached = answer_index.lookup(asked, user_input, scope=scope)
+        if cached:
+            feedback = cached["feedback"]
+            scores = cached["scores"] or score_feedback(feedback)
+        else:
+            feedback_json = wait_for_response(submit_feedback(user_input, feedback_model, user=user_id, role=st.session_state.role, round_type=st.session_state.round_type))
             try:
                 feedback = json.loads(feedback_json)
+                scores = score_feedback(feedback)
+                answer_index.add(asked, user_input, feedback, scores, scope=scope)
             except Exception:
                 feedback = {"content_depth": feedback_json, "clarity": "", "relevance": "", "confidence": ""}
-            feedback_str = (
-                f"Content Depth: {feedback.get('content_depth', '')}\n"
-                f"Clarity: {feedback.get('clarity', '')}\n"
-                f"Relevance: {feedback.get('relevance', '')}\n"
-                f"Confidence: {feedback.get('confidence', '')}"
-            )
-            st.session_state.messages[-1]["feedback"] = feedback_str
-
-            question_json = generate_interview_question(st.session_state.resume_text, st.session_state.role, question_model)
-            try:
-                question_data = json.loads(question_json)
-                question = question_data.get("question", "")
-                follow_up = question_data.get("follow_up_prompt", "")
-            except Exception:
-                question = question_json
-                follow_up = ""
-            st.session_state.messages.append({"role": "ai", "content": question, "follow_up": follow_up})
-            st.experimental_rerun()
+                scores = score_feedback(feedback)
+        feedback_str = (
+            f"Content Depth: {feedback.get('content_depth', '')}\n"
+            f"Clarity: {feedback.get('clarity', '')}\n"
+            f"Relevance: {feedback.get('relevance', '')}\n"
+            f"Confidence: {feedback.get('confidence', '')}"
+        )
+        question, follow_up = parse_question(wait_for_response(question_future))
+        # Appended only once both requests succeeded, so a cancelled one leaves the chat unchanged
+        st.session_state.messages.append({"role": "user", "content": user_input, "feedback": feedback_str})
+        st.session_state.messages.append({"role": "ai", "content": question, "follow_up": follow_up})
+        get_score_store().add(
+            scores,
+            role=st.session_state.role,
+            round=st.session_state.round_type,
+            model=feedback_model,
+            candidate=st.session_state.user_id
+        )
+        pregenerate_next_question()
+        st.experimental_rerun()
 
     # Downloads
     st.markdown("### Download your interview session history and feedback")
     session_text = build_session_history_text(st.session_state.messages)
     st.download_button("Download as Text", data=session_text, file_name="interview_session.txt", mime="text/plain")
+    session_md = b"".join(stream_session(st.session_state.messages, fmt="md"))
+    st.download_button("Download as Markdown", data=session_md, file_name="interview_session.md", mime="text/markdown")
+    session_json = b"".join(stream_session(st.session_state.messages, fmt="json"))
+    st.download_button("Download as JSON", data=session_json, file_name="interview_session.json", mime="application/json")
 
     try:
         from fpdf import FPDF
@@ -172,6 +205,8 @@ if resume_file and role:
         st.download_button("Download as PDF", data=pdf_bytes, file_name="interview_session.pdf", mime="application/pdf")
     except ImportError:
         st.info("To enable PDF download, install fpdf: `pip install fpdf`")
+    except Exception as e:
+        st.warning(f"PDF export failed: {e}")
 
 else:
     st.info("Please upload a PDF resume and select a job role to begin.")
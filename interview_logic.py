@@ -1,21 +1,9 @@
 import requests
 
-def generate_interview_question(resume_content, model="gemma3:1b"):
-    prompt = f"""
-You are an AI interview coach. Given the following resume content, generate one thoughtful interview question for a Software Engineer candidate, directly related to their experience or skills. 
-Provide a follow-up prompt structure to probe deeper if needed.
+from prompt_registry import render_prompt
 
-Resume:
-\"\"\"
-{resume_content}
-\"\"\"
-
-Respond in JSON format:
-{{
-  "question": "...",
-  "follow_up_prompt": "..."
-}}
-"""
+def generate_interview_question(resume_content, model="gemma3:1b", role="Software Engineer", round_type=None):
+    prompt, _ = render_prompt("question", role=role, round=round_type, model=model, resume_text=resume_content)
     try:
         response = requests.post(
             "http://localhost:11434/api/generate",
@@ -0,0 +1,255 @@
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+
+import requests
+
+OLLAMA_API_URL = "http://localhost:11434/api/generate"
+
+# Priority classes, highest first
+INTERACTIVE = 0
+PREGENERATION = 1
+BATCH = 2
+PRIORITY_NAMES = ("interactive", "pregeneration", "batch")
+
+# Admission limits on queued (not yet running) jobs per priority class
+DEFAULT_MAX_QUEUED = (64, 256, 10000)
+
+
+class QueueFullError(Exception):
+    """Raised when a priority class has no room for another job."""
+
+
+class DeadlineExceeded(Exception):
+    """Set on a job's future when it is dropped because its deadline passed."""
+
+
+class _Job:
+    def __init__(self, fn, args, kwargs, user, deadline):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.user = user
+        self.deadline = deadline
+        self.future = Future()
+
+    def expired(self, now):
+        return self.deadline is not None and now >= self.deadline
+
+    def drop(self):
+        # set_running_or_notify_cancel() is False if the caller already cancelled
+        if self.future.set_running_or_notify_cancel():
+            self.future.set_exception(DeadlineExceeded("Request expired before it was scheduled"))
+
+
+class LLMScheduler:
+    """
+    Runs LLM calls on a small pool of worker threads in priority order.
+
+    Jobs are served strictly by priority class (interactive, then
+    pre-generation, then batch). Inside a class, users are served round-robin
+    so one user's bulk submission cannot starve the others. Jobs whose
+    deadline has passed are dropped instead of being sent to the model, and
+    `interactive_reserve` workers only ever take interactive jobs so live
+    candidates always have a free slot while batch work is running.
+    """
+
+    def __init__(self, workers=2, interactive_reserve=1, max_queued=DEFAULT_MAX_QUEUED):
+        if not 0 <= interactive_reserve < workers:
+            raise ValueError("interactive_reserve must leave at least one general worker")
+        self.max_queued = max_queued
+        self._queues = [OrderedDict() for _ in PRIORITY_NAMES]
+        self._sizes = [0] * len(PRIORITY_NAMES)
+        self._cond = threading.Condition()
+        self._shutdown = False
+        self._threads = []
+        for i in range(workers):
+            lowest = INTERACTIVE if i < interactive_reserve else BATCH
+            thread = threading.Thread(target=self._worker, args=(lowest,), daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, fn, *args, priority=INTERACTIVE, user=None, timeout=None, **kwargs):
+        """
+        Queues fn(*args, **kwargs) and returns a Future for its result.
+
+        Args:
+            fn (callable): The work to run, typically an Ollama request.
+            priority (int): INTERACTIVE, PREGENERATION or BATCH.
+            user (str): Owner of the job, used for fair sharing and cancel_user.
+            timeout (float): Seconds after which the job is dropped if it has not started.
+
+        Returns:
+            concurrent.futures.Future: Resolves to fn's result, or raises
+            DeadlineExceeded if the job was dropped.
+
+        Raises:
+            QueueFullError: If the priority class is at its admission limit.
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        job = _Job(fn, args, kwargs, user, deadline)
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("Scheduler has been shut down")
+            if self._sizes[priority] >= self.max_queued[priority]:
+                self._drop_expired(priority)
+            if self._sizes[priority] >= self.max_queued[priority]:
+                raise QueueFullError(f"Too many queued {PRIORITY_NAMES[priority]} requests")
+            queue = self._queues[priority].setdefault(user, deque())
+            queue.append(job)
+            self._sizes[priority] += 1
+            self._cond.notify_all()
+        return job.future
+
+    def cancel_user(self, user, priority=None):
+        """
+        Drops all queued jobs of a user, e.g. pre-generations for a candidate who left.
+
+        Returns:
+            int: Number of jobs dropped.
+        """
+        classes = range(len(PRIORITY_NAMES)) if priority is None else [priority]
+        dropped = []
+        with self._cond:
+            for p in classes:
+                queue = self._queues[p].pop(user, None)
+                if queue:
+                    self._sizes[p] -= len(queue)
+                    dropped.extend(queue)
+        for job in dropped:
+            job.future.cancel()
+        return len(dropped)
+
+    def pending(self):
+        with self._cond:
+            return dict(zip(PRIORITY_NAMES, self._sizes))
+
+    def shutdown(self, wait=True):
+        with self._cond:
+            self._shutdown = True
+            self._cond.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def _drop_expired(self, priority):
+        now = time.monotonic()
+        queues = self._queues[priority]
+        for user in list(queues):
+            kept = deque()
+            for job in queues[user]:
+                if job.expired(now):
+                    job.drop()
+                    self._sizes[priority] -= 1
+                else:
+                    kept.append(job)
+            if kept:
+                queues[user] = kept
+            else:
+                del queues[user]
+
+    def _next_job(self, lowest):
+        # Caller holds self._cond
+        now = time.monotonic()
+        for priority in range(lowest + 1):
+            queues = self._queues[priority]
+            while queues:
+                user, queue = queues.popitem(last=False)
+                job = queue.popleft()
+                self._sizes[priority] -= 1
+                if queue:
+                    # Round-robin: this user goes to the back of the line
+                    queues[user] = queue
+                if job.expired(now):
+                    job.drop()
+                    continue
+                return job
+        return None
+
+    def _worker(self, lowest):
+        while True:
+            with self._cond:
+                job = self._next_job(lowest)
+                while job is None:
+                    if self._shutdown:
+                        return
+                    self._cond.wait()
+                    job = self._next_job(lowest)
+            if not job.future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = job.fn(*job.args, **job.kwargs)
+            except BaseException as e:
+                job.future.set_exception(e)
+            else:
+                job.future.set_result(result)
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """Returns the process-wide scheduler, sized from LLM_WORKERS / LLM_INTERACTIVE_RESERVE."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            workers = max(1, int(os.environ.get("LLM_WORKERS", "2")))
+            reserve = int(os.environ.get("LLM_INTERACTIVE_RESERVE", "1"))
+            _scheduler = LLMScheduler(workers=workers, interactive_reserve=min(reserve, workers - 1))
+        return _scheduler
+
+
+def _post_generate(api_url, model, prompt):
+    response = requests.post(
+        api_url,
+        json={"model": model, "prompt": prompt, "stream": False}
+    )
+    return response.json()
+
+
+def submit_generate(prompt, model, priority=INTERACTIVE, user=None, timeout=None, api_url=OLLAMA_API_URL):
+    """
+    Queues a generate request to Ollama on the shared scheduler without waiting.
+
+    Returns:
+        concurrent.futures.Future: Resolves to the decoded Ollama response.
+    """
+    return get_scheduler().submit(
+        _post_generate, api_url, model, prompt,
+        priority=priority, user=user, timeout=timeout
+    )
+
+
+def ollama_generate(prompt, model, priority=INTERACTIVE, user=None, timeout=None, api_url=OLLAMA_API_URL):
+    """
+    Sends a generate request to Ollama through the shared scheduler and waits for it.
+
+    Returns:
+        dict: The decoded Ollama response.
+    """
+    return submit_generate(prompt, model, priority=priority, user=user, timeout=timeout, api_url=api_url).result()
+
+
+# Example usage
+if __name__ == "__main__":
+    scheduler = LLMScheduler(workers=1, interactive_reserve=0)
+    order = []
+
+    def work(name):
+        time.sleep(0.05)
+        order.append(name)
+        return name
+
+    futures = [scheduler.submit(work, f"batch-{i}", priority=BATCH, user="nightly") for i in range(3)]
+    futures.append(scheduler.submit(work, "stale", priority=PREGENERATION, user="alice", timeout=0.01))
+    futures.append(scheduler.submit(work, "live", priority=INTERACTIVE, user="bob"))
+    for f in futures:
+        try:
+            f.result()
+        except DeadlineExceeded as e:
+            print("Dropped:", e)
+    print("Run order:", order)
+    scheduler.shutdown()
@@ -0,0 +1,190 @@
+import hashlib
+import string
+import threading
+
+ANY = "*"
+
+# Static instructions come first and per-request values last, so every
+# request for the same template shares a long identical prefix that the
+# model server can keep in its KV cache.
+QUESTION_TEMPLATE = """
+You are an AI interview coach. Given the following resume, generate one thoughtful interview question for the candidate's target role, directly related to their experience or skills.
+Provide a follow-up prompt structure to probe deeper if needed.
+
+Respond in JSON format:
+{{
+  "question": "...",
+  "follow_up_prompt": "..."
+}}
+
+Role: {role}
+
+Resume:
+\"\"\"
+{resume_text}
+\"\"\"
+"""
+
+# Filled in once per round with %-formatting, leaving the {fields} for render()
+ROUND_QUESTION_TEMPLATE = """
+You are an AI interview coach running the %(round_name)s round. Given the following resume, generate one %(round_focus)s interview question for the candidate's target role, directly related to their experience or skills.
+Provide a follow-up prompt structure to probe deeper if needed.
+
+Respond in JSON format:
+{{
+  "question": "...",
+  "follow_up_prompt": "..."
+}}
+
+Role: {role}
+
+Resume:
+\"\"\"
+{resume_text}
+\"\"\"
+"""
+
+FEEDBACK_TEMPLATE = """
+You are an AI interview coach. Given the following candidate's answer to an interview question, provide detailed feedback in the following four aspects: content depth, clarity, relevance, and confidence. For each aspect, write 1-2 sentences.
+
+Respond in JSON format:
+{{
+  "content_depth": "...",
+  "clarity": "...",
+  "relevance": "...",
+  "confidence": "..."
+}}
+
+Candidate's answer:
+\"\"\"
+{candidate_answer}
+\"\"\"
+"""
+
+ROUND_FOCUS = {
+    "Technical": "technical",
+    "HR": "behavioural",
+    "System Design": "system design",
+}
+
+
+class PromptTemplate:
+    """
+    A versioned prompt, parsed once into literal text and field names.
+
+    `key` combines the name, declared version and a hash of the text, so
+    caches keyed on it are invalidated whenever the wording changes.
+    """
+
+    def __init__(self, name, text, version):
+        self.name = name
+        self.text = text
+        self.version = version
+        self.key = f"{name}@{version}#{hashlib.sha1(text.encode('utf-8')).hexdigest()[:8]}"
+        self._parts = []
+        self.fields = []
+        for literal, field, spec, conversion in string.Formatter().parse(text):
+            if spec or conversion:
+                raise ValueError(f"Template {name} uses an unsupported format spec on {field}")
+            self._parts.append((literal, field))
+            if field is not None:
+                self.fields.append(field)
+
+    def render(self, **values):
+        missing = [f for f in self.fields if f not in values]
+        if missing:
+            raise KeyError(f"Template {self.name} is missing values for: {', '.join(missing)}")
+        chunks = []
+        for literal, field in self._parts:
+            chunks.append(literal)
+            if field is not None:
+                chunks.append(str(values[field]))
+        return "".join(chunks)
+
+
+class PromptRegistry:
+    """
+    Prompt templates keyed by name, role, round and model.
+
+    Lookups try the most specific entry first and fall back through
+    (role, round, *), (*, round, *) and (role, *, *) to (*, *, *), with
+    matching on role and round case-insensitive.
+    """
+
+    def __init__(self):
+        self._templates = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(value):
+        return (value or ANY).strip().lower()
+
+    def register(self, name, text, version, role=ANY, round=ANY, model=ANY):
+        template = PromptTemplate(name, text, version)
+        key = (name, self._normalize(role), self._normalize(round), model or ANY)
+        with self._lock:
+            self._templates[key] = template
+        return template
+
+    def get(self, name, role=None, round=None, model=None):
+        role, round, model = self._normalize(role), self._normalize(round), model or ANY
+        candidates = [
+            (role, round, model),
+            (role, round, ANY),
+            (ANY, round, model),
+            (ANY, round, ANY),
+            (role, ANY, model),
+            (role, ANY, ANY),
+            (ANY, ANY, model),
+            (ANY, ANY, ANY),
+        ]
+        for r, rd, m in candidates:
+            template = self._templates.get((name, r, rd, m))
+            if template is not None:
+                return template
+        raise KeyError(f"No prompt template registered for {name}")
+
+    def render(self, name, role=None, round=None, model=None, **values):
+        """
+        Builds a prompt from the best matching template.
+
+        Returns:
+            tuple: (prompt, template) so callers can key caches on template.key.
+        """
+        template = self.get(name, role=role, round=round, model=model)
+        if "role" in template.fields:
+            values.setdefault("role", role or "")
+        return template.render(**values), template
+
+
+def default_registry():
+    registry = PromptRegistry()
+    registry.register("question", QUESTION_TEMPLATE, version="2")
+    for round_name, focus in ROUND_FOCUS.items():
+        registry.register(
+            "question",
+            ROUND_QUESTION_TEMPLATE % {"round_name": round_name, "round_focus": focus},
+            version="2",
+            round=round_name,
+        )
+    registry.register("feedback", FEEDBACK_TEMPLATE, version="2")
+    return registry
+
+
+registry = default_registry()
+
+
+def render_prompt(name, role=None, round=None, model=None, **values):
+    return registry.render(name, role=role, round=round, model=model, **values)
+
+
+# Example usage
+if __name__ == "__main__":
+    prompt, template = render_prompt(
+        "question",
+        role="Data Scientist",
+        round="Technical",
+        resume_text="Built churn models in Python and deployed them with Flask.",
+    )
+    print(template.key)
+    print(prompt)
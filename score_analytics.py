@@ -0,0 +1,398 @@
+import contextlib
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+ASPECTS = ("content_score", "clarity_score", "relevance_score", "confidence_score")
+DIMENSIONS = ("role", "round", "model", "candidate")
+ROLLUP_DIMENSIONS = ("role", "round", "model")
+SECONDS_PER_DAY = 86400
+
+# Column files as (name, dtype, values per row)
+COLUMNS = (
+    ("times.f8", np.float64, 1),
+    ("codes.i4", np.int32, len(DIMENSIONS)),
+    ("scores.f4", np.float32, len(ASPECTS)),
+)
+
+
+@contextlib.contextmanager
+def _locked(path):
+    # Exclusive lock across processes, held while the column files are written
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class ScoreStore:
+    """
+    Columnar store of per-answer scores.
+
+    Each row is a timestamp, four dictionary-encoded dimension codes
+    (role, round, model, candidate) and the four aspect scores, kept in
+    NumPy arrays. When a directory is given, rows are appended to binary
+    column files there and read back with np.fromfile on startup.
+
+    Daily rollups (count and score sums per role, round and model) are
+    updated on every append so dashboards never scan the raw rows.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.categories = {d: [] for d in DIMENSIONS}
+        self._codes_by_name = {d: {} for d in DIMENSIONS}
+        self._times = np.empty(0, dtype=np.float64)
+        self._codes = np.empty((0, len(DIMENSIONS)), dtype=np.int32)
+        self._scores = np.empty((0, len(ASPECTS)), dtype=np.float32)
+        self._size = 0
+        self.rollups = {}
+        self._lock = threading.Lock()
+        if path:
+            os.makedirs(path, exist_ok=True)
+            self._load()
+
+    def __len__(self):
+        return self._size
+
+    # ------------------- Ingestion -------------------
+    def _column_file(self, name):
+        return os.path.join(self.path, name)
+
+    def _load(self):
+        categories_file = self._column_file("categories.json")
+        if not os.path.exists(categories_file):
+            return
+        # Another process may be mid-append, and a crash can leave a column
+        # with extra or partial rows, so only read up to the last row that is
+        # complete in every file. add() repairs the files under the lock.
+        # Rows are counted before reading the categories, which writers
+        # update first, so every code read has a name.
+        size = self._complete_rows()
+        with open(categories_file, "r", encoding="utf-8") as f:
+            self.categories = json.load(f)
+        self._codes_by_name = {d: {name: i for i, name in enumerate(self.categories[d])} for d in DIMENSIONS}
+        arrays = []
+        for name, dtype, width in COLUMNS:
+            path = self._column_file(name)
+            if size:
+                arrays.append(np.fromfile(path, dtype=dtype, count=size * width))
+            else:
+                arrays.append(np.empty(0, dtype=dtype))
+        self._times = arrays[0]
+        self._codes = arrays[1].reshape(-1, len(DIMENSIONS))
+        self._scores = arrays[2].reshape(-1, len(ASPECTS))
+        self._size = size
+        self._rebuild_rollups()
+
+    def _complete_rows(self):
+        rows = []
+        for name, dtype, width in COLUMNS:
+            path = self._column_file(name)
+            rows.append(os.path.getsize(path) // (np.dtype(dtype).itemsize * width) if os.path.exists(path) else 0)
+        return min(rows)
+
+    def _repair(self):
+        # Caller holds the append lock, so no other writer is mid-row
+        size = self._complete_rows()
+        for name, dtype, width in COLUMNS:
+            path = self._column_file(name)
+            nbytes = size * np.dtype(dtype).itemsize * width
+            if os.path.exists(path) and os.path.getsize(path) != nbytes:
+                os.truncate(path, nbytes)
+
+    def _sync_categories(self):
+        # Caller holds the append lock. Other processes writing to the same
+        # directory may have added categories; the lists are append-only, so
+        # adopt their new entries before encoding so codes agree on disk.
+        categories_file = self._column_file("categories.json")
+        if not os.path.exists(categories_file):
+            return
+        with open(categories_file, "r", encoding="utf-8") as f:
+            on_disk = json.load(f)
+        for d in DIMENSIONS:
+            for name in on_disk[d][len(self.categories[d]):]:
+                self._codes_by_name[d][name] = len(self.categories[d])
+                self.categories[d].append(name)
+
+    def _append_lock(self):
+        if not self.path:
+            return contextlib.nullcontext()
+        return _locked(self._column_file("append.lock"))
+
+    def _encode(self, dimension, value):
+        value = value or ""
+        code = self._codes_by_name[dimension].get(value)
+        if code is None:
+            code = len(self.categories[dimension])
+            self.categories[dimension].append(value)
+            self._codes_by_name[dimension][value] = code
+            return code, True
+        return code, False
+
+    def _grow(self, needed):
+        capacity = len(self._times)
+        if needed <= capacity:
+            return
+        capacity = max(needed, 1024, 2 * capacity)
+        times = np.empty(capacity, dtype=np.float64)
+        codes = np.empty((capacity, len(DIMENSIONS)), dtype=np.int32)
+        scores = np.empty((capacity, len(ASPECTS)), dtype=np.float32)
+        times[:self._size] = self._times[:self._size]
+        codes[:self._size] = self._codes[:self._size]
+        scores[:self._size] = self._scores[:self._size]
+        self._times, self._codes, self._scores = times, codes, scores
+
+    def add(self, scores, role="", round="", model="", candidate="", timestamp=None):
+        """
+        Appends one scored answer.
+
+        Args:
+            scores (dict): Output of scoring_function.score_feedback.
+            role (str): Job role of the interview.
+            round (str): Round type (e.g., "Technical", "HR").
+            model (str): Model that produced the feedback.
+            candidate (str): Candidate identifier.
+            timestamp (float): Unix time of the answer; defaults to now.
+        """
+        timestamp = time.time() if timestamp is None else float(timestamp)
+        row_scores = np.array([scores.get(a, 0) for a in ASPECTS], dtype=np.float32)
+        with self._lock, self._append_lock():
+            if self.path:
+                self._sync_categories()
+            values = dict(zip(DIMENSIONS, (role, round, model, candidate)))
+            encoded = [self._encode(d, values[d]) for d in DIMENSIONS]
+            row_codes = np.array([code for code, _ in encoded], dtype=np.int32)
+
+            self._grow(self._size + 1)
+            self._times[self._size] = timestamp
+            self._codes[self._size] = row_codes
+            self._scores[self._size] = row_scores
+            self._size += 1
+
+            key = tuple(values[d] or "" for d in ROLLUP_DIMENSIONS) + (int(timestamp // SECONDS_PER_DAY),)
+            rollup = self.rollups.setdefault(key, np.zeros(1 + len(ASPECTS)))
+            rollup[0] += 1
+            rollup[1:] += row_scores
+
+            if self.path:
+                self._repair()
+                if any(new for _, new in encoded):
+                    # Replaced atomically: a torn categories.json would stop the store loading
+                    categories_file = self._column_file("categories.json")
+                    with open(categories_file + ".tmp", "w", encoding="utf-8") as f:
+                        json.dump(self.categories, f, ensure_ascii=False)
+                    os.replace(categories_file + ".tmp", categories_file)
+                for (name, dtype, _), column in zip(COLUMNS, (np.float64(timestamp), row_codes, row_scores)):
+                    with open(self._column_file(name), "ab") as f:
+                        f.write(np.asarray(column, dtype=dtype).tobytes())
+
+    def _rebuild_rollups(self):
+        self.rollups = {}
+        if self._size == 0:
+            return
+        dims = [DIMENSIONS.index(d) for d in ROLLUP_DIMENSIONS]
+        days = (self._times[:self._size] // SECONDS_PER_DAY).astype(np.int64)
+        keys = np.column_stack([self._codes[:self._size, dims].astype(np.int64), days])
+        unique_keys, inverse = np.unique(keys, axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        counts = np.bincount(inverse, minlength=len(unique_keys))
+        sums = np.stack([
+            np.bincount(inverse, weights=self._scores[:self._size, j], minlength=len(unique_keys))
+            for j in range(len(ASPECTS))
+        ], axis=1)
+        for row, count, total in zip(unique_keys, counts, sums):
+            names = tuple(self.categories[d][int(code)] for d, code in zip(ROLLUP_DIMENSIONS, row[:-1]))
+            self.rollups[names + (int(row[-1]),)] = np.concatenate([[count], total])
+
+    # ------------------- Queries -------------------
+    def _snapshot(self, start=None, end=None, **filters):
+        with self._lock:
+            size = self._size
+            times = self._times[:size]
+            codes = self._codes[:size]
+            scores = self._scores[:size]
+        mask = np.ones(size, dtype=bool)
+        if start is not None:
+            mask &= times >= start
+        if end is not None:
+            mask &= times < end
+        for dimension, value in filters.items():
+            if value is None:
+                continue
+            code = self._codes_by_name[dimension].get(value, -1)
+            mask &= codes[:, DIMENSIONS.index(dimension)] == code
+        return times[mask], codes[mask], scores[mask]
+
+    def _group(self, codes, by):
+        if not by:
+            return np.zeros(len(codes), dtype=np.int64), [()]
+        dims = [DIMENSIONS.index(d) for d in by]
+        shape = tuple(max(1, len(self.categories[d])) for d in by)
+        flat = np.ravel_multi_index(tuple(codes[:, i] for i in dims), shape)
+        unique_flat, inverse = np.unique(flat, return_inverse=True)
+        labels = [
+            tuple(self.categories[d][int(c)] for d, c in zip(by, np.unravel_index(f, shape)))
+            for f in unique_flat
+        ]
+        return inverse.reshape(-1), labels
+
+    def aggregate(self, by=("role",), start=None, end=None, percentiles=(25, 50, 75), **filters):
+        """
+        Per-group count, mean aspect scores and percentiles of the average score.
+
+        Args:
+            by (tuple): Dimensions to group by, any of DIMENSIONS.
+            start (float): Inclusive lower bound on the unix timestamp.
+            end (float): Exclusive upper bound on the unix timestamp.
+            percentiles (tuple): Percentiles of the per-answer average score.
+            **filters: Exact-match filters such as role="Data Scientist".
+
+        Returns:
+            list: One dict per group.
+        """
+        _, codes, scores = self._snapshot(start, end, **filters)
+        if len(scores) == 0:
+            return []
+        inverse, labels = self._group(codes, by)
+        counts = np.bincount(inverse, minlength=len(labels))
+        means = np.stack([
+            np.bincount(inverse, weights=scores[:, j], minlength=len(labels)) / counts
+            for j in range(len(ASPECTS))
+        ], axis=1)
+        averages = scores.mean(axis=1)
+        order = np.lexsort((averages, inverse))
+        groups = np.split(averages[order], np.cumsum(counts)[:-1])
+
+        results = []
+        for label, count, mean, values in zip(labels, counts, means, groups):
+            results.append({
+                **dict(zip(by, label)),
+                "count": int(count),
+                "mean": {a: round(float(m), 2) for a, m in zip(ASPECTS, mean)},
+                "average_score": round(float(mean.mean()), 2),
+                "percentiles": {str(p): round(float(v), 2) for p, v in zip(percentiles, np.percentile(values, percentiles))},
+            })
+        return results
+
+    def trend(self, bucket_seconds=SECONDS_PER_DAY, start=None, end=None, **filters):
+        """
+        Mean average score per time bucket, oldest first.
+
+        Returns:
+            list: Dicts with bucket_start (unix time), count and average_score.
+        """
+        times, _, scores = self._snapshot(start, end, **filters)
+        if len(times) == 0:
+            return []
+        buckets, inverse = np.unique((times // bucket_seconds).astype(np.int64), return_inverse=True)
+        inverse = inverse.reshape(-1)
+        counts = np.bincount(inverse)
+        totals = np.bincount(inverse, weights=scores.mean(axis=1))
+        return [
+            {"bucket_start": int(b * bucket_seconds), "count": int(c), "average_score": round(float(t / c), 2)}
+            for b, c, t in zip(buckets, counts, totals)
+        ]
+
+    def weakest_aspects(self, start=None, end=None, **filters):
+        """
+        Lowest-scoring aspect per candidate.
+
+        Returns:
+            dict: candidate -> {"aspect": ..., "mean": ..., "count": ...}
+        """
+        _, codes, scores = self._snapshot(start, end, **filters)
+        if len(scores) == 0:
+            return {}
+        inverse, labels = self._group(codes, ("candidate",))
+        counts = np.bincount(inverse, minlength=len(labels))
+        means = np.stack([
+            np.bincount(inverse, weights=scores[:, j], minlength=len(labels)) / counts
+            for j in range(len(ASPECTS))
+        ], axis=1)
+        weakest = means.argmin(axis=1)
+        return {
+            label[0]: {
+                "aspect": ASPECTS[w],
+                "mean": round(float(means[i, w]), 2),
+                "count": int(counts[i]),
+            }
+            for i, (label, w) in enumerate(zip(labels, weakest))
+        }
+
+    def rollup(self, by=ROLLUP_DIMENSIONS, start_day=None, end_day=None):
+        """
+        Reads the precomputed daily rollups, merged over the requested dimensions.
+
+        Args:
+            by (tuple): Subset of ROLLUP_DIMENSIONS to keep; "day" may be added for a daily series.
+            start_day (int): Inclusive lower bound, in days since the epoch.
+            end_day (int): Exclusive upper bound, in days since the epoch.
+
+        Returns:
+            list: Dicts with the group labels, count and mean aspect scores.
+        """
+        keep = [i for i, d in enumerate(ROLLUP_DIMENSIONS + ("day",)) if d in by]
+        merged = {}
+        with self._lock:
+            items = [(key, value.copy()) for key, value in self.rollups.items()]
+        for key, value in items:
+            day = key[-1]
+            if start_day is not None and day < start_day:
+                continue
+            if end_day is not None and day >= end_day:
+                continue
+            group = tuple(key[i] for i in keep)
+            if group in merged:
+                merged[group] += value
+            else:
+                merged[group] = value
+        names = [(ROLLUP_DIMENSIONS + ("day",))[i] for i in keep]
+        return [
+            {
+                **dict(zip(names, group)),
+                "count": int(value[0]),
+                "mean": {a: round(float(s / value[0]), 2) for a, s in zip(ASPECTS, value[1:])},
+            }
+            for group, value in sorted(merged.items())
+        ]
+
+
+# Example usage
+if __name__ == "__main__":
+    store = ScoreStore()
+    rng = np.random.RandomState(0)
+    roles = ["Software Engineer", "Data Scientist"]
+    for i in range(1000):
+        s = rng.randint(2, 11, size=4)
+        store.add(
+            dict(zip(ASPECTS, s)),
+            role=roles[i % 2],
+            round="Technical",
+            model="gemma3:1b",
+            candidate=f"cand-{i % 7}",
+            timestamp=1_700_000_000 + i * 3600,
+        )
+    print(store.aggregate(by=("role",)))
+    print(store.trend()[:3])
+    print(store.weakest_aspects())
+    print(store.rollup(by=("role",)))
@@ -0,0 +1,296 @@
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+EXPORT_FORMATS = ("txt", "md", "json", "pdf")
+
+EXPORT_MIMETYPES = {
+    "txt": "text/plain",
+    "md": "text/markdown",
+    "json": "application/json",
+    "pdf": "application/pdf",
+}
+
+# TrueType fonts with broad Unicode coverage, tried in order for PDF export.
+# Set EXPORT_FONT_PATH to point at a specific font file.
+UNICODE_FONT_PATHS = [
+    os.environ.get("EXPORT_FONT_PATH", ""),
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/dejavu/DejaVuSans.ttf",
+    "/Library/Fonts/Arial Unicode.ttf",
+    "C:\\Windows\\Fonts\\arial.ttf",
+]
+
+PDF_CHUNK_SIZE = 64 * 1024
+
+SCORE_KEYS = ("content_score", "clarity_score", "relevance_score", "confidence_score")
+
+# pyfpdf's TrueType support only covers the Basic Multilingual Plane
+ASTRAL_CHARS = re.compile("[\U00010000-\U0010FFFF]")
+
+
+def format_scores(scores):
+    return (
+        f"Scores: Content={scores['content_score']}/10, Clarity={scores['clarity_score']}/10, "
+        f"Relevance={scores['relevance_score']}/10, Confidence={scores['confidence_score']}/10"
+    )
+
+
+def validate_session(messages):
+    """
+    Checks that messages have the shape the exporters read.
+
+    Raises:
+        ValueError: Naming the first malformed message.
+    """
+    if not isinstance(messages, list):
+        raise ValueError("messages must be a list")
+    for i, msg in enumerate(messages):
+        if not isinstance(msg, dict) or "role" not in msg or "content" not in msg:
+            raise ValueError(f"Message {i} must be an object with role and content")
+        scores = msg.get("scores")
+        if scores and (not isinstance(scores, dict) or any(k not in scores for k in SCORE_KEYS)):
+            raise ValueError(f"Message {i} has scores without {', '.join(SCORE_KEYS)}")
+
+
+def iter_session_entries(messages):
+    """
+    Walks a chat session and yields one (kind, text) pair per rendered block.
+
+    Args:
+        messages (iterable): Session messages as stored in st.session_state.messages.
+
+    Yields:
+        tuple: (kind, text) where kind is "ai", "user", "feedback", "scores" or "gap".
+    """
+    for msg in messages:
+        if msg["role"] == "ai":
+            yield "ai", f"AI Interviewer: {msg['content']}"
+        else:
+            yield "user", f"You: {msg['content']}"
+            if msg.get("feedback"):
+                yield "feedback", f"Feedback:\n{msg['feedback']}"
+            if msg.get("scores"):
+                yield "scores", format_scores(msg["scores"])
+        yield "gap", ""
+
+
+def iter_session_text(messages):
+    for _, text in iter_session_entries(messages):
+        yield text + "\n"
+
+
+def iter_session_markdown(messages):
+    yield "# Interview Session\n\n"
+    for kind, text in iter_session_entries(messages):
+        if kind == "ai":
+            yield f"**AI Interviewer:** {text[len('AI Interviewer: '):]}\n\n"
+        elif kind == "user":
+            yield f"**You:** {text[len('You: '):]}\n\n"
+        elif kind == "feedback":
+            body = text[len("Feedback:\n"):].replace("\n", "\n> ")
+            yield f"> **Feedback:**\n> {body}\n\n"
+        elif kind == "scores":
+            yield f"📊 {text}\n\n"
+
+
+def iter_session_json(messages):
+    # Emit the array one message at a time so large sessions never need
+    # a single in-memory JSON document.
+    yield "[\n"
+    first = True
+    for msg in messages:
+        if not first:
+            yield ",\n"
+        yield "  " + json.dumps(msg, ensure_ascii=False)
+        first = False
+    yield "\n]\n"
+
+
+def find_unicode_font(font_path=None):
+    for path in [font_path] + UNICODE_FONT_PATHS:
+        if path and os.path.isfile(path):
+            return path
+    return None
+
+
+def iter_session_pdf(messages, font_path=None, chunk_size=PDF_CHUNK_SIZE):
+    """
+    Renders a session to PDF and yields the document in byte chunks.
+
+    A Unicode TrueType font is embedded when one is available, with
+    characters above U+FFFF (e.g. emoji) replaced; otherwise the core Arial
+    font is used and characters outside latin-1 are replaced. Either way
+    the text is cleaned up front instead of failing inside FPDF.output.
+
+    Args:
+        messages (iterable): Session messages.
+        font_path (str): Optional path to a .ttf font with Unicode coverage.
+        chunk_size (int): Size of the yielded byte chunks.
+
+    Yields:
+        bytes: Consecutive pieces of the PDF file.
+    """
+    from fpdf import FPDF
+
+    pdf = FPDF()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    font = find_unicode_font(font_path)
+    if font:
+        pdf.add_font("Unicode", "", font, uni=True)
+        pdf.set_font("Unicode", size=12)
+
+        def clean(text):
+            return ASTRAL_CHARS.sub("?", text)
+    else:
+        pdf.set_font("Arial", size=12)
+
+        def clean(text):
+            return text.encode("latin-1", "replace").decode("latin-1")
+
+    colors = {
+        "ai": (0, 0, 180),
+        "user": (0, 0, 0),
+        "feedback": (128, 0, 0),
+        "scores": (0, 128, 0),
+    }
+    pdf.add_page()
+    for kind, text in iter_session_entries(messages):
+        if kind == "gap":
+            pdf.ln(3)
+            continue
+        pdf.set_text_color(*colors[kind])
+        pdf.multi_cell(0, 10, clean(text))
+
+    data = pdf.output(dest="S")
+    if isinstance(data, str):
+        data = data.encode("latin-1")
+    del pdf
+    view = memoryview(data)
+    for start in range(0, len(view), chunk_size):
+        yield bytes(view[start:start + chunk_size])
+
+
+def stream_session(messages, fmt="txt", font_path=None):
+    """
+    Yields an export of the session as bytes, suitable for a file or an HTTP response body.
+
+    Args:
+        messages (iterable): Session messages.
+        fmt (str): One of EXPORT_FORMATS.
+        font_path (str): Optional Unicode font for PDF export.
+
+    Yields:
+        bytes: Encoded chunks of the export.
+    """
+    if fmt == "pdf":
+        yield from iter_session_pdf(messages, font_path=font_path)
+        return
+    if fmt == "txt":
+        chunks = iter_session_text(messages)
+    elif fmt == "md":
+        chunks = iter_session_markdown(messages)
+    elif fmt == "json":
+        chunks = iter_session_json(messages)
+    else:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    for chunk in chunks:
+        yield chunk.encode("utf-8")
+
+
+def write_session(messages, fp, fmt="txt", font_path=None):
+    """
+    Writes a session export to a binary file-like object.
+
+    Returns:
+        int: Number of bytes written.
+    """
+    written = 0
+    for chunk in stream_session(messages, fmt=fmt, font_path=font_path):
+        fp.write(chunk)
+        written += len(chunk)
+    return written
+
+
+def load_session(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def export_session_file(src_path, dst_path, fmt="txt", font_path=None):
+    messages = load_session(src_path)
+    with open(dst_path, "wb") as fp:
+        write_session(messages, fp, fmt=fmt, font_path=font_path)
+    return dst_path
+
+
+def unique_export_paths(session_paths, out_dir, fmt):
+    """Maps each session to an output path, adding -1, -2, ... when basenames collide."""
+    used = set()
+    dst_paths = []
+    for path in session_paths:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        name, n = stem, 0
+        while name in used:
+            n += 1
+            name = f"{stem}-{n}"
+        used.add(name)
+        dst_paths.append(os.path.join(out_dir, name + "." + fmt))
+    return dst_paths
+
+
+def export_sessions(session_paths, out_dir, fmt="pdf", max_workers=None, font_path=None):
+    """
+    Exports many stored sessions (JSON files of messages) in parallel.
+
+    A session that fails to load or render is reported in its own result
+    and does not stop the others.
+
+    Args:
+        session_paths (list): Paths of stored session JSON files.
+        out_dir (str): Directory where exports are written.
+        fmt (str): One of EXPORT_FORMATS.
+        max_workers (int): Worker processes; defaults to the CPU count.
+        font_path (str): Optional Unicode font for PDF export.
+
+    Returns:
+        list: One {"source", "path", "error"} dict per session, in input order;
+        "path" is None and "error" is set for sessions that failed.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    if not session_paths:
+        return []
+    os.makedirs(out_dir, exist_ok=True)
+    dst_paths = unique_export_paths(session_paths, out_dir, fmt)
+    results = []
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [
+            pool.submit(export_session_file, src, dst, fmt, font_path)
+            for src, dst in zip(session_paths, dst_paths)
+        ]
+        for src, future in zip(session_paths, futures):
+            try:
+                results.append({"source": src, "path": future.result(), "error": None})
+            except Exception as e:
+                results.append({"source": src, "path": None, "error": f"{type(e).__name__}: {e}"})
+    return results
+
+
+# Example usage
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export stored interview sessions")
+    parser.add_argument("sessions", nargs="+", help="Session JSON files")
+    parser.add_argument("--out", default="exports", help="Output directory")
+    parser.add_argument("--format", default="pdf", choices=EXPORT_FORMATS)
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes")
+    args = parser.parse_args()
+
+    for result in export_sessions(args.sessions, args.out, fmt=args.format, max_workers=args.workers):
+        if result["error"]:
+            print("Failed:", result["source"], "-", result["error"])
+        else:
+            print("Exported:", result["path"])
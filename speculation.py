@@ -0,0 +1,24 @@
+# Speculative work that nobody collects is dropped by the scheduler after this long
+SPECULATION_TIMEOUT = 300
+
+
+def promote(future, resubmit):
+    """
+    Reuses a speculative future if it is running or already succeeded.
+
+    A future that is still queued at a background priority is cancelled and
+    resubmitted through `resubmit()` so the candidate does not wait behind
+    other background work; failed or missing futures are resubmitted too.
+
+    Returns:
+        concurrent.futures.Future: The future to wait on.
+    """
+    # cancel() is also True for a future that was already cancelled, e.g. by
+    # LLMScheduler.cancel_user, and a queued future that expired has a
+    # DeadlineExceeded exception, so both are resubmitted here
+    if future is None or future.cancel():
+        return resubmit()
+    if future.done() and future.exception() is not None:
+        return resubmit()
+    return future
+
@@ -3,7 +3,11 @@ import requests
 import PyPDF2
 import io
 import json
-from fpdf import FPDF
+import os
+import uuid
+from prompt_registry import render_prompt
+from score_analytics import ScoreStore
+from session_exporter import iter_session_text, stream_session
 
 OLLAMA_API_URL = "http://localhost:11434/api/generate"
 OLLAMA_MODEL = "gemma3:1b"
@@ -20,19 +24,7 @@ def extract_text_from_pdf(pdf_file):
 
 # ------------------- Question Generation -------------------
 def generate_interview_question(resume_text, role):
-    prompt = f"""
-You are an AI interview coach. Given the following resume, generate one thoughtful interview question for a {role} candidate, directly related to their experience or skills.
-Provide a follow-up prompt structure to probe deeper if needed.
-
-Resume:
-\"\"\"{resume_text}\"\"\"
-
-Respond in JSON format:
-{{
-  "question": "...",
-  "follow_up_prompt": "..."
-}}
-"""
+    prompt, _ = render_prompt("question", role=role, model=OLLAMA_MODEL, resume_text=resume_text)
     response = requests.post(
         OLLAMA_API_URL,
         json={"model": OLLAMA_MODEL, "prompt": prompt, "stream": False}
@@ -41,20 +33,7 @@ Respond in JSON format:
 
 # ------------------- Feedback Generation -------------------
 def generate_feedback(candidate_answer):
-    prompt = f"""
-You are an AI interview coach. Given the following candidate's answer to an interview question, provide detailed feedback in the following four aspects: content depth, clarity, relevance, and confidence. For each aspect, write 1-2 sentences.
-
-Candidate's answer:
-\"\"\"{candidate_answer}\"\"\"
-
-Respond in JSON format:
-{{
-  "content_depth": "...",
-  "clarity": "...",
-  "relevance": "...",
-  "confidence": "..."
-}}
-"""
+    prompt, _ = render_prompt("feedback", model=OLLAMA_MODEL, candidate_answer=candidate_answer)
     response = requests.post(
         OLLAMA_API_URL,
         json={"model": OLLAMA_MODEL, "prompt": prompt, "stream": False}
@@ -91,44 +70,17 @@ def score_feedback(feedback):
         "confidence_score": score_from_text(feedback.get("confidence", "")),
     }
 
+# ------------------- Score Analytics -------------------
+@st.cache_resource
+def get_score_store():
+    return ScoreStore(os.environ.get("ANALYTICS_DIR", "analytics_data"))
+
 # ------------------- Export Utilities -------------------
 def build_session_history_text(messages):
-    lines = []
-    for msg in messages:
-        if msg["role"] == "ai":
-            lines.append(f"AI Interviewer: {msg['content']}")
-        else:
-            lines.append(f"You: {msg['content']}")
-            if "feedback" in msg:
-                lines.append(f"Feedback:\n{msg['feedback']}")
-            if "scores" in msg:
-                scores = msg["scores"]
-                lines.append(f"Scores: Content={scores['content_score']}/10, Clarity={scores['clarity_score']}/10, Relevance={scores['relevance_score']}/10, Confidence={scores['confidence_score']}/10")
-        lines.append("")
-    return "\n".join(lines)
+    return "".join(iter_session_text(messages))
 
 def build_session_history_pdf(messages):
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_auto_page_break(auto=True, margin=15)
-    pdf.set_font("Arial", size=12)
-
-    for msg in messages:
-        if msg["role"] == "ai":
-            pdf.set_text_color(0, 0, 180)
-            pdf.multi_cell(0, 10, f"AI Interviewer: {msg['content']}")
-        else:
-            pdf.set_text_color(0, 0, 0)
-            pdf.multi_cell(0, 10, f"You: {msg['content']}")
-            if "feedback" in msg:
-                pdf.set_text_color(128, 0, 0)
-                pdf.multi_cell(0, 10, f"Feedback:\n{msg['feedback']}")
-            if "scores" in msg:
-                scores = msg["scores"]
-                pdf.set_text_color(0, 128, 0)
-                pdf.multi_cell(0, 10, f"Scores: Content={scores['content_score']}/10, Clarity={scores['clarity_score']}/10, Relevance={scores['relevance_score']}/10, Confidence={scores['confidence_score']}/10")
-        pdf.ln(3)
-    return pdf.output(dest='S').encode('latin-1')
+    return b"".join(stream_session(messages, fmt="pdf"))
 
 # ------------------- Streamlit UI -------------------
 st.set_page_config(page_title="AI Interview Coach", page_icon=":robot_face:")
@@ -137,6 +89,8 @@ st.write("Upload your resume, select a job role, and chat with your AI interview
 
 if "messages" not in st.session_state:
     st.session_state.messages = []
+if "user_id" not in st.session_state:
+    st.session_state.user_id = uuid.uuid4().hex
 
 resume_file = st.file_uploader("Upload your PDF Resume", type=["pdf"])
 role = st.selectbox("Select the job role:", ["Software Engineer", "Data Scientist", "Product Manager", "Designer", "Other"])
@@ -198,6 +152,7 @@ if resume_file and role:
 
             st.session_state.messages[-1]["feedback"] = feedback_str
             st.session_state.messages[-1]["scores"] = scores
+            get_score_store().add(scores, role=st.session_state.role, model=OLLAMA_MODEL, candidate=st.session_state.user_id)
 
             question_json = generate_interview_question(st.session_state.resume_text, st.session_state.role)
             try:
@@ -0,0 +1,247 @@
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Finished jobs are kept this long for polling, then forgotten
+JOB_TTL = 3600
+
+# Set once per worker process by _load_model
+_model = None
+_started = None
+
+
+class PoolBusyError(Exception):
+    """Raised when the transcription queue is at its admission limit."""
+
+
+def _load_model(model_size, threads, started):
+    # Runs once in each worker process so the model stays resident between jobs
+    global _model, _started
+    _started = started
+    import torch
+    import whisper
+
+    torch.set_num_threads(threads)
+    _model = whisper.load_model(model_size)
+
+
+def _transcribe(job_id, audio_path):
+    try:
+        # Lets the parent mark the job as transcribing as soon as a worker picks it up
+        _started.put(job_id)
+        result = _model.transcribe(audio_path, fp16=False)
+        return result["text"].strip()
+    finally:
+        os.remove(audio_path)
+
+
+class TranscriptionPool:
+    """
+    Bounded pool of Whisper worker processes with pollable jobs.
+
+    Each worker loads the model once and keeps it for its lifetime. Uploads
+    are written to temp files, queued, and tracked under a job ID whose
+    status moves through queued -> transcribing -> evaluating -> done (or
+    error). When `on_transcript` is given, it is called with the transcript
+    on a separate thread and its return value is stored as the job result.
+
+    Args:
+        model_size (str): Whisper model size: tiny, base, small, medium, large.
+        workers (int): Worker processes; defaults to the CPU count.
+        max_pending (int): Jobs allowed to wait for a worker before PoolBusyError.
+        on_transcript (callable): on_transcript(transcript, **job_fields) -> dict.
+    """
+
+    def __init__(self, model_size="base", workers=None, max_pending=32, on_transcript=None):
+        self.model_size = model_size
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.on_transcript = on_transcript
+        self._pool = None
+        self._started = None
+        self._watcher = None
+        self._followups = ThreadPoolExecutor(max_workers=self.workers)
+        self._jobs = {}
+        self._cond = threading.Condition()
+
+    def _get_pool(self):
+        # Created lazily so importing the app does not spawn processes; caller holds self._cond
+        if self._pool is None:
+            threads = max(1, (os.cpu_count() or 1) // self.workers)
+            context = multiprocessing.get_context("spawn")
+            self._started = context.Queue()
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=context,
+                initializer=_load_model,
+                initargs=(self.model_size, threads, self._started),
+            )
+            self._watcher = threading.Thread(target=self._watch_started, args=(self._started,), daemon=True)
+            self._watcher.start()
+        return self._pool
+
+    def _reset_pool(self, pool):
+        # A worker that dies (e.g. OOM) breaks the executor for good, so drop
+        # it and let the next submit start a fresh one
+        with self._cond:
+            if self._pool is not pool:
+                return
+            self._pool = None
+            self._started.put(None)
+        pool.shutdown(wait=False)
+
+    def _watch_started(self, started):
+        while True:
+            job_id = started.get()
+            if job_id is None:
+                return
+            with self._cond:
+                # The start message can arrive after the result, so only move queued jobs
+                job = self._jobs.get(job_id)
+                if job is not None and job["status"] == "queued":
+                    job.update(status="transcribing", updated=time.time())
+                    self._cond.notify_all()
+
+    def submit(self, audio_bytes, suffix=".wav", **fields):
+        """
+        Queues an uploaded audio file for transcription.
+
+        Args:
+            audio_bytes (bytes): Raw contents of the uploaded file.
+            suffix (str): File extension, so ffmpeg can detect the format.
+            **fields: Extra values passed through to on_transcript (question, role, ...).
+
+        Returns:
+            str: The job ID.
+
+        Raises:
+            PoolBusyError: If max_pending jobs are already waiting.
+        """
+        with self._cond:
+            self._evict()
+            waiting = sum(1 for job in self._jobs.values() if job["status"] in ("queued", "transcribing"))
+            if waiting >= self.max_pending + self.workers:
+                raise PoolBusyError("Too many audio answers are being transcribed, try again later")
+            job_id = uuid.uuid4().hex
+            self._jobs[job_id] = {
+                "job_id": job_id,
+                "status": "queued",
+                "transcript": None,
+                "result": None,
+                "error": None,
+                "updated": time.time(),
+            }
+
+        audio_path = None
+        try:
+            with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as f:
+                audio_path = f.name
+                f.write(audio_bytes)
+            with self._cond:
+                pool = self._get_pool()
+            try:
+                future = pool.submit(_transcribe, job_id, audio_path)
+            except BrokenProcessPool:
+                self._reset_pool(pool)
+                with self._cond:
+                    pool = self._get_pool()
+                future = pool.submit(_transcribe, job_id, audio_path)
+        except Exception as e:
+            if audio_path and os.path.exists(audio_path):
+                os.remove(audio_path)
+            self._update(job_id, status="error", error=f"Could not queue audio: {e}")
+            raise
+        future.add_done_callback(lambda fut: self._transcribed(job_id, fut, fields, pool, audio_path))
+        return job_id
+
+    def _update(self, job_id, **changes):
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job.update(changes, updated=time.time())
+            self._cond.notify_all()
+
+    def _transcribed(self, job_id, future, fields, pool, audio_path):
+        # Runs on the executor's management thread, so hand slow work off
+        try:
+            transcript = future.result()
+        except BrokenProcessPool as e:
+            # Every job still on the broken pool lands here and is marked failed;
+            # a dead worker never reaches the cleanup in _transcribe
+            self._reset_pool(pool)
+            if os.path.exists(audio_path):
+                os.remove(audio_path)
+            self._update(job_id, status="error", error=f"Transcription worker crashed: {e}")
+            return
+        except Exception as e:
+            self._update(job_id, status="error", error=f"Transcription failed: {e}")
+            return
+        if self.on_transcript is None:
+            self._update(job_id, status="done", transcript=transcript)
+            return
+        self._update(job_id, status="evaluating", transcript=transcript)
+        self._followups.submit(self._evaluate, job_id, transcript, fields)
+
+    def _evaluate(self, job_id, transcript, fields):
+        try:
+            result = self.on_transcript(transcript, **fields)
+        except Exception as e:
+            self._update(job_id, status="error", error=f"Evaluation failed: {e}")
+        else:
+            self._update(job_id, status="done", result=result)
+
+    def _evict(self):
+        # Caller holds self._cond
+        cutoff = time.time() - JOB_TTL
+        for job_id in [j for j, job in self._jobs.items() if job["status"] in ("done", "error") and job["updated"] < cutoff]:
+            del self._jobs[job_id]
+
+    def status(self, job_id):
+        """Returns a snapshot of the job, or None for unknown (or expired) IDs."""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            return dict(job)
+
+    def wait(self, job_id, last_updated=None, timeout=15):
+        """
+        Blocks until the job changes after `last_updated` or the timeout passes.
+
+        Returns:
+            dict: The job snapshot, or None for unknown IDs.
+        """
+        with self._cond:
+            self._cond.wait_for(
+                lambda: job_id not in self._jobs or self._jobs[job_id]["updated"] != last_updated,
+                timeout=timeout,
+            )
+        return self.status(job_id)
+
+    def events(self, job_id, timeout=15):
+        """
+        Yields job snapshots each time the job changes, ending once it is done or failed.
+        A snapshot is also yielded every `timeout` seconds as a keep-alive.
+        """
+        last_updated = None
+        while True:
+            job = self.wait(job_id, last_updated, timeout=timeout)
+            if job is None:
+                return
+            last_updated = job["updated"]
+            yield job
+            if job["status"] in ("done", "error"):
+                return
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._started.put(None)
+            self._watcher.join()
+        self._followups.shutdown(wait=True)